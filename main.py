@@ -2,15 +2,27 @@ from fastapi import FastAPI
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-import subprocess
+import asyncio
 import os
+import traceback
 from datetime import datetime
-import threading
-import queue
+from collections import deque
+from itertools import islice, takewhile
 
-processes = {}
-log_content = []
-log_lock = threading.Lock()
+from spotify_sheets_core import run_logger_task, run_once_task
+from logger import played_today
+
+# Loggers run in-process; keyed by the script the web UI knows them as.
+# log.py checks every 10 minutes, logger.py logs today's tracks once and exits.
+SCRIPTS = {
+    "log.py": lambda log: run_logger_task(10, log),
+    "logger.py": lambda log: run_once_task(log, filter_fn=played_today),
+}
+tasks = {}
+SHUTDOWN_TIMEOUT = 30  # Seconds to wait for running loggers when the app stops
+log_content = deque(maxlen=1000)  # (seq, message) pairs; oldest are dropped automatically
+log_seq = 0  # Id of the most recent log entry
+log_cleared_seq = 0  # Clients that last saw an id below this must reset their view
 
 
 @asynccontextmanager
@@ -19,17 +31,16 @@ async def lifespan(app: FastAPI):
     log_message("Server running at http://127.0.0.1:8000")
     yield
     log_message("Application shutting down, stopping all scripts...")
-    for script_name, proc in list(processes.items()):
-        if proc.poll() is None:
+    for script_name, task in list(tasks.items()):
+        if not task.done():
             log_message(f"Stopping {script_name}...")
-            try:
-                proc.terminate()
-                proc.wait(timeout=3)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-                proc.wait()
-            except Exception as e:
-                log_message(f"Error stopping {script_name}: {e}")
+            task.cancel()
+    if tasks:
+        # Each logger finishes its current request first; don't hang shutdown on one
+        _, pending = await asyncio.wait(tasks.values(), timeout=SHUTDOWN_TIMEOUT)
+        for script_name, task in tasks.items():
+            if task in pending:
+                log_message(f"{script_name} did not stop within {SHUTDOWN_TIMEOUT}s, abandoning it")
 
 
 app = FastAPI(lifespan=lifespan)
@@ -39,35 +50,34 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
 def log_message(msg):
+    global log_seq
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     formatted_msg = f"[{timestamp}] {msg}"
-    with log_lock:
-        log_content.append(formatted_msg)
-        if len(log_content) > 1000:  # Increased from 500 to keep more logs
-            log_content.pop(0)
+    log_seq += 1
+    log_content.append((log_seq, formatted_msg))
     print(formatted_msg)  # Also print to console for debugging
 
 
-def read_process_output(proc, script_name):
-    """Read output from subprocess and log each line immediately"""
-    try:
-        while True:
-            line = proc.stdout.readline()
-            if not line:
-                # Check if process has ended
-                if proc.poll() is not None:
-                    break
-                continue
-            
-            # Strip whitespace and log
+def script_logger(script_name):
+    """Build a log function that tags each non-empty output line with the script name"""
+    def log(msg=''):
+        for line in str(msg).splitlines():
             line = line.strip()
             if line:
                 log_message(f"[{script_name}] {line}")
-                
-    except Exception as e:
-        log_message(f"[{script_name}] Error reading output: {e}")
-    finally:
-        log_message(f"[{script_name}] Process ended (exit code: {proc.poll()})")
+    return log
+
+
+def on_script_done(script_name, task):
+    """Log how a logger task ended"""
+    if task.cancelled():
+        log_message(f"✓ Stopped {script_name}")
+    elif task.exception() is not None:
+        error = task.exception()
+        log_message(f"[{script_name}] Crashed: {error}")
+        script_logger(script_name)("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+    else:
+        log_message(f"[{script_name}] Finished")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -82,64 +92,34 @@ async def read_root():
 @app.post("/run-script/{script_name}")
 async def run_script(script_name: str):
     
-    if script_name not in ["log.py", "logger.py"]:
+    if script_name not in SCRIPTS:
         log_message(f"Invalid script name: {script_name}")
         return JSONResponse(
             content={"status": "error", "message": f"Invalid script: {script_name}"},
             status_code=400
         )
     
-    if script_name in processes:
-        proc = processes[script_name]
-        if proc.poll() is None:
-            log_message(f"{script_name} is already running (PID: {proc.pid})")
-            return JSONResponse(
-                content={"status": "info", "message": f"{script_name} is already running"}
-            )
-    
-    if not os.path.exists(script_name):
-        log_message(f"Script not found: {script_name}")
+    if script_name in tasks and not tasks[script_name].done():
+        log_message(f"{script_name} is already running")
         return JSONResponse(
-            content={"status": "error", "message": f"Script '{script_name}' not found"},
-            status_code=404
+            content={"status": "info", "message": f"{script_name} is already running"}
         )
     
     try:
         log_message(f"Starting {script_name}...")
         
-        # Use PYTHONUNBUFFERED to disable output buffering
-        env = os.environ.copy()
-        env['PYTHONUNBUFFERED'] = '1'
-        
-        proc = subprocess.Popen(
-            ["python", "-u", script_name],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=0,  # Unbuffered
-            env=env
-        )
+        task = asyncio.create_task(SCRIPTS[script_name](script_logger(script_name)))
+        task.add_done_callback(lambda t: on_script_done(script_name, t))
+        tasks[script_name] = task
         
-        processes[script_name] = proc
-        
-        # Start output reader thread
-        thread = threading.Thread(
-            target=read_process_output,
-            args=(proc, script_name),
-            daemon=True
-        )
-        thread.start()
-        
-        log_message(f"✓ Started {script_name} (PID: {proc.pid})")
-        log_message(f"[{script_name}] Watching for output...")
+        log_message(f"✓ Started {script_name}")
         
         return JSONResponse(
-            content={"status": "success", "message": f"Started {script_name}", "pid": proc.pid}
+            content={"status": "success", "message": f"Started {script_name}"}
         )
         
     except Exception as e:
         log_message(f"Error starting {script_name}: {e}")
-        import traceback
         log_message(f"Traceback: {traceback.format_exc()}")
         return JSONResponse(
             content={"status": "error", "message": f"Error: {str(e)}"},
@@ -150,66 +130,55 @@ async def run_script(script_name: str):
 @app.post("/stop-script/{script_name}")
 async def stop_script(script_name: str):
     
-    if script_name not in processes:
+    if script_name not in tasks:
         log_message(f"Script {script_name} is not running")
         return JSONResponse(
             content={"status": "info", "message": f"{script_name} is not running"}
         )
     
-    proc = processes[script_name]
+    task = tasks[script_name]
     
-    if proc.poll() is not None:
+    if task.done():
         log_message(f"Script {script_name} has already stopped")
-        del processes[script_name]
+        del tasks[script_name]
         return JSONResponse(
             content={"status": "info", "message": f"{script_name} has already stopped"}
         )
     
-    try:
-        log_message(f"Stopping {script_name} (PID: {proc.pid})...")
-        
-        proc.terminate()
-        
-        try:
-            proc.wait(timeout=5)
-            log_message(f"✓ Stopped {script_name}")
-        except subprocess.TimeoutExpired:
-            log_message(f"Force killing {script_name}...")
-            proc.kill()
-            proc.wait()
-            log_message(f"✓ Force stopped {script_name}")
-        
-        del processes[script_name]
-        return JSONResponse(
-            content={"status": "success", "message": f"Stopped {script_name}"}
-        )
-        
-    except Exception as e:
-        log_message(f"Error stopping {script_name}: {e}")
-        return JSONResponse(
-            content={"status": "error", "message": f"Error: {str(e)}"},
-            status_code=500
-        )
+    log_message(f"Stopping {script_name}...")
+    # The task stays in `tasks` (and counts as running) until the worker thread
+    # has finished its current cycle; on_script_done reports when it has
+    task.cancel()
+    return JSONResponse(
+        content={"status": "success", "message": f"Stopping {script_name}"}
+    )
 
 
 @app.get("/get-updates")
-async def get_updates():
-    with log_lock:
-        # Get last 100 log entries for display
-        display_logs = log_content[-100:] if len(log_content) > 100 else log_content
-        return JSONResponse(
-            content={
-                "logs": "\n".join(display_logs) if display_logs else "No logs yet. Click a button to run a script.",
-                "timestamp": datetime.now().isoformat(),
-                "total_logs": len(log_content)
-            }
-        )
+async def get_updates(since: int = 0):
+    # The client is starting over if the log was cleared or the server restarted
+    reset = since < log_cleared_seq or since > log_seq
+    if reset:
+        since = 0
+    # Only send entries the client hasn't seen yet, capped at the last 100
+    new_count = sum(1 for _ in takewhile(lambda entry: entry[0] > since, reversed(log_content)))
+    new_logs = [msg for _, msg in islice(log_content, len(log_content) - min(new_count, 100), None)]
+    return JSONResponse(
+        content={
+            "logs": new_logs,
+            "last_id": log_seq,
+            "reset": reset,
+            "timestamp": datetime.now().isoformat(),
+            "total_logs": len(log_content)
+        }
+    )
 
 
 @app.post("/clear-log")
 async def clear_log():
-    with log_lock:
-        log_content.clear()
+    global log_cleared_seq
+    log_content.clear()
+    log_cleared_seq = log_seq + 1
     log_message("Log cleared")
     return JSONResponse(
         content={"status": "success", "message": "Log cleared"}
@@ -221,15 +190,15 @@ async def get_status():
     status = {}
     scripts_to_remove = []
     
-    for script_name, proc in processes.items():
-        if proc.poll() is None:
-            status[script_name] = {"running": True, "pid": proc.pid}
+    for script_name, task in tasks.items():
+        if not task.done():
+            status[script_name] = {"running": True}
         else:
-            status[script_name] = {"running": False, "pid": None}
+            status[script_name] = {"running": False}
             scripts_to_remove.append(script_name)
     
     for script_name in scripts_to_remove:
-        del processes[script_name]
+        del tasks[script_name]
     
     return JSONResponse(content=status)
 
@@ -0,0 +1,623 @@
+"""Shared Spotify and Google Sheets logic used by log.py and logger.py"""
+
+import spotipy
+from spotipy.oauth2 import SpotifyOAuth
+from spotipy.cache_handler import CacheHandler
+import gspread
+import requests
+from urllib3.util.retry import Retry
+from google.oauth2.service_account import Credentials
+from datetime import datetime
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import time
+import os
+import json
+import tempfile
+import traceback
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Spotify API Configuration
+SPOTIPY_CLIENT_ID = os.getenv('SPOTIPY_CLIENT_ID')
+SPOTIPY_CLIENT_SECRET = os.getenv('SPOTIPY_CLIENT_SECRET')
+SPOTIPY_REDIRECT_URI = os.getenv('SPOTIPY_REDIRECT_URI', 'http://127.0.0.1:8888/callback')
+SCOPE = 'user-read-recently-played'
+# Server errors the Spotify HTTP session retries itself; 429s are left to
+# retry_rate_limited below, which caps Retry-After and can be interrupted on stop
+SPOTIFY_RETRY_STATUSES = (500, 502, 503, 504)
+
+# Google Sheets Configuration
+SPREADSHEET_NAME = os.getenv('SPREADSHEET_NAME', 'Spotify Listening History')
+# Seconds to wait on any single Sheets/Drive request
+SHEETS_TIMEOUT = 30
+# Marker file recording that the sheet's header row has already been checked
+HEADER_VERIFIED_FILE = os.getenv('HEADER_VERIFIED_FILE', '.header_verified')
+
+# Verbose per-cycle output (recent tracks, skipped duplicates); off in production
+DEBUG = os.getenv('DEBUG', '').lower() in ('1', 'true', 'yes')
+
+# Where the last access token is kept so restarts can reuse it until it expires
+SPOTIFY_TOKEN_CACHE = os.getenv(
+    'SPOTIFY_TOKEN_CACHE', os.path.join(tempfile.gettempdir(), 'spotify_token.json')
+)
+
+# Custom cache handler that inherits from CacheHandler
+class RefreshTokenCacheHandler(CacheHandler):
+    """Custom cache handler for using a refresh token"""
+    def __init__(self, refresh_token, access_token='', cache_path=SPOTIFY_TOKEN_CACHE, log=print):
+        self.refresh_token = refresh_token
+        self.cache_path = cache_path
+        self.log = log
+        self.token_info = self._load_cached_token() or {
+            'refresh_token': refresh_token,
+            'access_token': access_token,
+            'expires_at': 0  # Force refresh on first use
+        }
+    
+    def _load_cached_token(self):
+        """Load the token saved by a previous run, if it belongs to this refresh token"""
+        try:
+            with open(self.cache_path, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get('source_refresh_token') != self.refresh_token:
+            return None
+        return cached.get('token_info')
+    
+    def get_cached_token(self):
+        return self.token_info
+    
+    def save_token_to_cache(self, token_info):
+        # Preserve the refresh token
+        if 'refresh_token' not in token_info and self.refresh_token:
+            token_info['refresh_token'] = self.refresh_token
+        self.token_info = token_info
+        try:
+            # Create the file owner-only from the start; it holds a live access token
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_NOFOLLOW', 0)
+            fd = os.open(self.cache_path, flags, 0o600)
+            if hasattr(os, 'fchmod'):
+                os.fchmod(fd, 0o600)  # In case an older run created it with wider permissions
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'source_refresh_token': self.refresh_token, 'token_info': token_info}, f)
+        except OSError as e:
+            self.log(f"[WARN] Could not save Spotify token cache: {e}")
+
+def _spotify_session():
+    """Build the HTTP session for the Spotify client.
+
+    Same retry settings as spotipy's own session, except urllib3 must not honor
+    Retry-After: it would otherwise retry 429s itself, sleeping the full header
+    value, before retry_rate_limited ever sees them.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=SPOTIFY_RETRY_STATUSES,
+        respect_retry_after_header=False
+    )
+    adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def setup_spotify(log=print):
+    """Initialize Spotify client with authentication"""
+    if not SPOTIPY_CLIENT_ID or not SPOTIPY_CLIENT_SECRET:
+        raise ValueError("Missing Spotify credentials! Please check your .env file.")
+    
+    # Check if we have a refresh token (for server/cloud deployment)
+    refresh_token = os.getenv('SPOTIFY_REFRESH_TOKEN')
+    
+    if refresh_token:
+        # Use refresh token (server mode)
+        log("[OK] Using Spotify refresh token from environment")
+        if DEBUG:
+            log(f"[DEBUG] Refresh token starts with: {refresh_token[:20]}...")
+        
+        access_token = os.getenv('SPOTIFY_ACCESS_TOKEN', '')
+        cache_handler = RefreshTokenCacheHandler(refresh_token, access_token, log=log)
+        
+        sp_oauth = SpotifyOAuth(
+            client_id=SPOTIPY_CLIENT_ID,
+            client_secret=SPOTIPY_CLIENT_SECRET,
+            redirect_uri=SPOTIPY_REDIRECT_URI,
+            scope=SCOPE,
+            cache_handler=cache_handler,
+            open_browser=False
+        )
+        
+        # Try to validate/refresh the token
+        try:
+            token_info = sp_oauth.validate_token(cache_handler.get_cached_token())
+            if not token_info:
+                log("[INFO] Refreshing expired token...")
+                token_info = sp_oauth.refresh_access_token(refresh_token)
+                cache_handler.save_token_to_cache(token_info)
+            log("[OK] Token validated successfully")
+        except Exception as e:
+            log(f"[ERROR] Token validation failed: {e}")
+            log("[ERROR] Please check if your SPOTIFY_REFRESH_TOKEN is valid")
+            log("[ERROR] You may need to run get_spotify_tokens.py again to get a new refresh token")
+            raise
+        
+        sp = spotipy.Spotify(auth_manager=sp_oauth, requests_session=_spotify_session())
+    else:
+        # Interactive mode (local development)
+        log("[OK] Using interactive Spotify authentication")
+        cache_path = os.getenv('CACHE_PATH', '.cache')
+        
+        sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
+            client_id=SPOTIPY_CLIENT_ID,
+            client_secret=SPOTIPY_CLIENT_SECRET,
+            redirect_uri=SPOTIPY_REDIRECT_URI,
+            scope=SCOPE,
+            cache_path=cache_path,
+            open_browser=False 
+        ), requests_session=_spotify_session())
+    
+    return sp
+
+def _headers_verified(worksheet):
+    """Whether a previous run already checked this worksheet's header row"""
+    try:
+        with open(HEADER_VERIFIED_FILE, 'r') as f:
+            return f.read().strip() == f"{worksheet.spreadsheet.id}:{worksheet.id}"
+    except OSError:
+        return False
+
+def _mark_headers_verified(worksheet):
+    """Remember that the header row is in place so later runs skip the check"""
+    try:
+        with open(HEADER_VERIFIED_FILE, 'w') as f:
+            f.write(f"{worksheet.spreadsheet.id}:{worksheet.id}")
+    except OSError:
+        pass
+
+def setup_google_sheets(log=print):
+    """Initialize Google Sheets client"""
+    scopes = [
+        'https://www.googleapis.com/auth/spreadsheets',
+        'https://www.googleapis.com/auth/drive'
+    ]
+    
+    # Check if credentials are in environment variable (for Render/cloud deployment)
+    google_creds_json = os.getenv('GOOGLE_CREDENTIALS_FILE')
+    
+    if google_creds_json:
+        # Load from environment variable
+        try:
+            creds_dict = json.loads(google_creds_json)
+            creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+            log("[OK] Loaded Google credentials from environment variable")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in GOOGLE_CREDENTIALS_JSON: {e}")
+    else:
+        # Load from file (for local development)
+        google_creds_file = os.getenv('GOOGLE_CREDENTIALS_FILE', 'logger.json')
+        if not os.path.exists(google_creds_file):
+            raise FileNotFoundError(
+                f"Google credentials file '{google_creds_file}' not found. "
+                "Please set GOOGLE_CREDENTIALS_JSON environment variable or provide the file."
+            )
+        creds = Credentials.from_service_account_file(google_creds_file, scopes=scopes)
+        log(f"[OK] Loaded Google credentials from file: {google_creds_file}")
+    
+    client = gspread.authorize(creds)
+    # gspread waits forever by default; a stalled request would hang the logger
+    client.set_timeout(SHEETS_TIMEOUT)
+    
+    # Open existing spreadsheet (must be created manually)
+    try:
+        spreadsheet = client.open(SPREADSHEET_NAME)
+        worksheet = spreadsheet.sheet1
+        
+        # Check if headers exist, if not add them (once per deploy)
+        if not _headers_verified(worksheet):
+            headers = worksheet.row_values(1)
+            if not headers or headers[0] != 'Played At':
+                worksheet.insert_row([
+                    'Played At', 'Track Name', 'Artist(s)', 
+                    'Album', 'Duration (ms)', 'Track ID', 'Genres'
+                ], index=1)
+                log("[OK] Headers added to spreadsheet")
+            _mark_headers_verified(worksheet)
+        
+        log(f"[OK] Connected to spreadsheet: '{SPREADSHEET_NAME}'")
+        return worksheet
+        
+    except gspread.SpreadsheetNotFound:
+        log(f"\n[ERROR] Spreadsheet '{SPREADSHEET_NAME}' not found!")
+        log("\nPlease create the spreadsheet manually:")
+        log("1. Go to https://sheets.google.com")
+        log(f"2. Create a new blank spreadsheet")
+        log(f"3. Rename it to: '{SPREADSHEET_NAME}'")
+        log(f"4. Click 'Share' and add this email as Editor:")
+        
+        # Show the service account email
+        if google_creds_json:
+            creds_data = json.loads(google_creds_json)
+        else:
+            with open(google_creds_file, 'r') as f:
+                creds_data = json.load(f)
+        log(f"   {creds_data['client_email']}")
+        
+        log("\n5. Run this script again!\n")
+        raise
+
+def _is_rate_limited(e):
+    """Whether a Spotify or Sheets error is a 429 Too Many Requests"""
+    if isinstance(e, gspread.exceptions.APIError):
+        return e.code == 429
+    return getattr(e, 'http_status', None) == 429
+
+def _retry_after(e):
+    """Seconds the API asked us to wait (Retry-After header), if any"""
+    headers = getattr(e, 'headers', None)
+    if headers is None and isinstance(e, gspread.exceptions.APIError):
+        headers = e.response.headers
+    try:
+        return float(headers['Retry-After'])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+MAX_RETRY_WAIT = 60  # Seconds; longer Retry-After values are capped so stopping stays responsive
+_backoff = wait_exponential_jitter(initial=1, max=MAX_RETRY_WAIT)
+
+# The stop event of the logger running on this thread, if any
+_worker = threading.local()
+
+def _set_stop_event(stop_event):
+    """Let retries on this thread see whether the logger is being stopped"""
+    _worker.stop_event = stop_event
+
+def _wait_for_rate_limit(retry_state):
+    """Honor Retry-After when the API sends it, otherwise back off exponentially"""
+    retry_after = _retry_after(retry_state.outcome.exception())
+    if retry_after is None:
+        return _backoff(retry_state)
+    return min(retry_after, MAX_RETRY_WAIT)
+
+def _stop_requested(retry_state):
+    """Give up retrying once the logger has been asked to stop"""
+    return _stopped(getattr(_worker, 'stop_event', None))
+
+def _retry_sleep(seconds):
+    """Sleep between retries, waking up early if the logger is stopped"""
+    _wait(seconds, getattr(_worker, 'stop_event', None))
+
+# Retry rate-limited calls instead of losing the whole polling cycle
+retry_rate_limited = retry(
+    retry=retry_if_exception(_is_rate_limited),
+    wait=_wait_for_rate_limit,
+    stop=stop_after_attempt(5) | _stop_requested,
+    sleep=_retry_sleep,
+    reraise=True
+)
+
+@retry_rate_limited
+def fetch_recently_played(sp):
+    """Get recently played tracks (limit 50 - Spotify API maximum)"""
+    return sp.current_user_recently_played(limit=50)
+
+@retry_rate_limited
+def fetch_artists(sp, artist_ids):
+    """Get full artist objects for up to 50 artist IDs"""
+    return sp.artists(artist_ids)['artists']
+
+@retry_rate_limited
+def append_tracks(worksheet, rows):
+    """Append rows to the sheet in a single request"""
+    # table_range tells the API where the table starts, so rows go after that table
+    worksheet.append_rows(
+        rows,
+        value_input_option='RAW',
+        insert_data_option='INSERT_ROWS',
+        table_range='A1'
+    )
+
+# Artist genres rarely change, so remember them for the life of the process
+_artist_genre_cache = {}
+
+def get_artists_genres(sp, artist_ids, log=print):
+    """Get genres for several artists, keyed by artist ID"""
+    missing = [artist_id for artist_id in artist_ids if artist_id not in _artist_genre_cache]
+    try:
+        # The artists endpoint accepts up to 50 IDs per request
+        for i in range(0, len(missing), 50):
+            for artist in fetch_artists(sp, missing[i:i + 50]):
+                if artist:
+                    _artist_genre_cache[artist['id']] = ', '.join(artist['genres']) or 'Unknown'
+    except Exception as e:
+        log(f"Error fetching genres: {e}")
+    return {
+        artist_id: _artist_genre_cache[artist_id]
+        for artist_id in artist_ids if artist_id in _artist_genre_cache
+    }
+
+def get_existing_entries(worksheet):
+    """Fetch (Played At, Track ID) keys already in the sheet"""
+    # Only pull columns A (Played At) and F (Track ID) instead of the whole sheet
+    response = worksheet.spreadsheet.values_batch_get(
+        ranges=[f"'{worksheet.title}'!A2:A", f"'{worksheet.title}'!F2:F"],
+        params={'majorDimension': 'COLUMNS'}
+    )
+    columns = [
+        value_range['values'][0] if value_range.get('values') else []
+        for value_range in response.get('valueRanges', [])
+    ]
+    if len(columns) < 2:
+        return set()
+    played_at_col, track_id_col = columns[0], columns[1]
+    return {
+        f"{played_at}_{track_id}"
+        for played_at, track_id in zip(played_at_col, track_id_col)
+        if played_at and track_id
+    }
+
+def get_last_modified(worksheet):
+    """Get the spreadsheet's modifiedTime from Drive (a cheap metadata call)"""
+    return worksheet.spreadsheet.get_lastUpdateTime()
+
+def parse_played_at(played_at):
+    """Parse Spotify's played_at timestamp (ISO 8601 with a 'Z' suffix)"""
+    if played_at.endswith('Z'):
+        return datetime.fromisoformat(played_at[:-1] + '+00:00')
+    return datetime.fromisoformat(played_at)
+
+def build_row(item, genres_by_id):
+    """Turn a recently-played item into a sheet row"""
+    track = item['track']
+    # Genres are only looked up for the first artist to minimize API calls
+    artist_id = track['artists'][0]['id'] if track['artists'] else None
+    return [
+        item['played_at'],
+        track['name'],
+        ', '.join(artist['name'] for artist in track['artists']),
+        track['album']['name'],
+        track['duration_ms'],
+        track['id'],
+        genres_by_id.get(artist_id, 'Unknown')
+    ]
+
+def get_recently_played(sp, worksheet, existing_entries=None, filter_fn=None, log=print,
+                        prefetched=None):
+    """Fetch recently played tracks and log to Google Sheets.
+
+    Only items for which filter_fn(item) is true are logged, if given.
+    prefetched may be a Future already fetching the recently played tracks.
+    Returns the number of tracks logged, or None if the cycle failed.
+    """
+    try:
+        # Get recently played tracks (limit 50 - Spotify API maximum)
+        if prefetched is not None:
+            results = prefetched.result()
+        else:
+            results = fetch_recently_played(sp)
+        
+        log(f"   Found {len(results['items'])} tracks from Spotify API")
+        
+        # Debug: Show the first 5 tracks with timestamps
+        if DEBUG and results['items']:
+            log("\n   === DEBUG: Recent tracks from Spotify ===")
+            for i, item in enumerate(results['items'][:5]):
+                track = item['track']
+                played_at = item['played_at']
+                log(f"   {i+1}. '{track['name']}' by {track['artists'][0]['name']}")
+                log(f"      Played at: {played_at}")
+            log("   ==========================================\n")
+        
+        # Get existing track IDs and timestamps to avoid duplicates
+        # (only hit the sheet if the caller isn't tracking them in memory)
+        if existing_entries is None:
+            existing_entries = get_existing_entries(worksheet)
+        
+        log(f"   Already logged: {len(existing_entries)} entries in sheet")
+        
+        skipped_tracks = []
+        filtered_tracks = []
+        pending_items = []
+        
+        for item in reversed(results['items']):  # Reverse to maintain chronological order
+            track = item['track']
+            played_at = item['played_at']
+            
+            # Skip tracks the caller isn't interested in
+            if filter_fn and not filter_fn(item):
+                filtered_tracks.append(item)
+                continue
+            
+            # Create unique key for this entry
+            entry_key = f"{played_at}_{track['id']}"
+            
+            # Skip if already logged
+            if entry_key in existing_entries:
+                skipped_tracks.append(item)
+                continue
+            
+            pending_items.append(item)
+        
+        # Get genres for all first artists in a single request
+        artist_ids = {
+            item['track']['artists'][0]['id']
+            for item in pending_items if item['track']['artists']
+        }
+        genres_by_id = get_artists_genres(sp, artist_ids, log) if artist_ids else {}
+        
+        new_tracks = [build_row(item, genres_by_id) for item in pending_items]
+        
+        # Show what's being skipped
+        if filtered_tracks:
+            log(f"\n   === Skipped {len(filtered_tracks)} tracks outside the logging window ===")
+            for skip in filtered_tracks[:3]:
+                log(f"   - {skip['track']['name']} at {skip['played_at']}")
+            if len(filtered_tracks) > 3:
+                log(f"   ... and {len(filtered_tracks) - 3} more")
+            log("   ==========================================\n")
+        if DEBUG and skipped_tracks:
+            log(f"\n   === DEBUG: Skipped {len(skipped_tracks)} duplicate tracks ===")
+            for skip in skipped_tracks[:3]:
+                log(f"   - {skip['track']['name']} at {skip['played_at']}")
+            if len(skipped_tracks) > 3:
+                log(f"   ... and {len(skipped_tracks) - 3} more")
+            log("   ==========================================\n")
+        
+        # Append new tracks to sheet
+        if new_tracks:
+            append_tracks(worksheet, new_tracks)
+            existing_entries.update(f"{row[0]}_{row[5]}" for row in new_tracks)
+            log(f"[OK] Logged {len(new_tracks)} new tracks")
+            log("   New tracks added:")
+            for track in new_tracks:
+                log(f"   - {track[1]} at {track[0]}")
+        else:
+            log("[OK] No new tracks to log (all already in sheet)")
+        return len(new_tracks)
+            
+    except Exception as e:
+        log(f"Error: {e}")
+        log(traceback.format_exc())
+        return None
+
+# Serializes sheet reads and writes between the loggers sharing this process
+_sheet_lock = threading.Lock()
+
+def _wait(seconds, stop_event):
+    """Sleep between cycles; returns True if the logger was asked to stop"""
+    if stop_event is None:
+        time.sleep(seconds)
+        return False
+    return stop_event.wait(seconds)
+
+def _stopped(stop_event):
+    """Whether the logger has been asked to stop"""
+    return stop_event is not None and stop_event.is_set()
+
+def run_logger(interval_minutes=10, filter_fn=None, log=print, stop_event=None):
+    """Run the logger continuously (until stop_event is set, if given)"""
+    _set_stop_event(stop_event)
+    log("Initializing Spotify Logger...")
+    sp = setup_spotify(log)
+    worksheet = setup_google_sheets(log)
+    if _stopped(stop_event):
+        return
+    # Load the sheet's entries once and keep the set up to date locally;
+    # only re-read them if someone else has modified the sheet since
+    with _sheet_lock:
+        last_modified = get_last_modified(worksheet)
+        existing_entries = get_existing_entries(worksheet)
+    
+    log(f"Logger started! Checking every {interval_minutes} minutes.")
+    if stop_event is None:
+        log("Press Ctrl+C to stop.\n")
+    
+    # Spotify and Sheets are independent services, so fetch from Spotify in the
+    # background while checking whether the sheet changed
+    executor = ThreadPoolExecutor(
+        max_workers=1, initializer=_set_stop_event, initargs=(stop_event,)
+    )
+    try:
+        while not _stopped(stop_event):
+            try:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                log(f"\n[{timestamp}] Checking for new tracks...")
+                recent = executor.submit(fetch_recently_played, sp)
+                # Hold the lock from the change check through reading back our own
+                # write, so another logger's rows can't slip in unnoticed
+                with _sheet_lock:
+                    modified = get_last_modified(worksheet)
+                    if modified != last_modified:
+                        log("   Sheet changed since last check, reloading logged entries...")
+                        existing_entries = get_existing_entries(worksheet)
+                        last_modified = modified
+                    logged = get_recently_played(
+                        sp, worksheet, existing_entries, filter_fn, log, prefetched=recent
+                    )
+                    if logged:
+                        # Our own write bumps modifiedTime; remember it so we don't reload
+                        last_modified = get_last_modified(worksheet)
+                    elif logged is None:
+                        # The cycle failed part-way, so resync from the sheet next time
+                        last_modified = None
+                
+                # Wait for specified interval
+                if _wait(interval_minutes * 60, stop_event):
+                    break
+                
+            except KeyboardInterrupt:
+                log("\n\nLogger stopped by user.")
+                break
+            except Exception as e:
+                log(f"Unexpected error: {e}")
+                log(traceback.format_exc())
+                log("Retrying in 5 minutes...")
+                if _wait(300, stop_event):
+                    break
+    finally:
+        executor.shutdown(wait=False)
+
+def run_once(filter_fn=None, log=print, stop_event=None):
+    """Check for new tracks a single time"""
+    _set_stop_event(stop_event)
+    log("Initializing Spotify Logger...")
+    sp = setup_spotify(log)
+    worksheet = setup_google_sheets(log)
+    if _stopped(stop_event):
+        return
+    log("Checking for new tracks...")
+    with _sheet_lock:
+        get_recently_played(sp, worksheet, filter_fn=filter_fn, log=log)
+    log("Script finished.")
+
+async def _run_in_worker(target, log_fn, *args):
+    """Run target(*args, log, stop_event) in a worker thread, sending its output to log_fn.
+
+    The Spotify and Sheets clients are blocking, so they can't run on the event
+    loop; log lines are handed back to the event loop thread. Cancelling stops
+    the worker, but only finishes once its thread has exited (after the cycle
+    in progress, if any).
+    """
+    loop = asyncio.get_running_loop()
+    stop_event = threading.Event()
+    
+    def log(msg=''):
+        try:
+            loop.call_soon_threadsafe(log_fn, msg)
+        except RuntimeError:
+            # The event loop has already shut down
+            print(msg)
+    
+    worker = asyncio.ensure_future(asyncio.to_thread(target, *args, log, stop_event))
+    try:
+        await asyncio.shield(worker)
+    except asyncio.CancelledError:
+        stop_event.set()
+        # Keep the task alive until the thread is really gone, even if
+        # it's cancelled again in the meantime
+        while not worker.done():
+            try:
+                await asyncio.wait({worker})
+            except asyncio.CancelledError:
+                pass
+        if not worker.cancelled():
+            worker.exception()  # Already stopping; don't report it as unretrieved
+        raise
+
+async def run_logger_task(interval_minutes, log_fn, filter_fn=None):
+    """Run the logger continuously from an event loop, sending its output to log_fn"""
+    await _run_in_worker(run_logger, log_fn, interval_minutes, filter_fn)
+
+async def run_once_task(log_fn, filter_fn=None):
+    """Check for new tracks once from an event loop, sending its output to log_fn"""
+    await _run_in_worker(run_once, log_fn, filter_fn)